@@ -9,8 +9,11 @@ Users should call :meth:`SrtConverter.convert` to read and write files.
 """
 
 import os
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator
+from functools import cached_property
 from pathlib import Path
-import re
 from ..utils import read_lines
 
 class Subtitle:
@@ -37,6 +40,18 @@ class Subtitle:
         
         self._text = text
         
+    @classmethod
+    def _from_canonical(cls, start, stop, text):
+        """ 
+        Make Subtitle from `start` and `stop` strings that are already in 
+        "HH:MM:ss,mmm" format, skipping verification.
+        """
+        sub = cls.__new__(cls)
+        sub._start = start
+        sub._stop = stop
+        sub._text = text
+        return sub
+        
     @property
     def start(self):
         return self._start
@@ -49,55 +64,70 @@ class Subtitle:
     def text(self):
         return self._text
     
+    @cached_property
+    def _start_s(self):
+        """ `start` in seconds, parsed once on first access """
+        return self.timestamp_to_seconds(self._start)
+    
+    @cached_property
+    def _stop_s(self):
+        """ `stop` in seconds, parsed once on first access """
+        return self.timestamp_to_seconds(self._stop)
+    
     def __lt__(self, other):
         """ Return True if self's `start` is before other's """
-        return self.timestamp_to_seconds(self.start) < self.timestamp_to_seconds(other.start)
+        return self._start_s < other._start_s
     
     def __gt__(self, other):
         """ Return True if self's `start` is after other's """
-        return self.timestamp_to_seconds(self.start) > self.timestamp_to_seconds(other.start)
+        return self._start_s > other._start_s
     
     def __eq__(self, other):
         """ Return True if self's `start` is same as other's """
-        return self.start == other.start
+        return self._start_s == other._start_s
+    
+    @cached_property
+    def _str(self):
+        """ Formatted subtitle, built once on first access """
+        return f"{self._start} --> {self._stop}{os.linesep}{self._text}"
     
     def __repr__(self):
-        return f"{self.start} --> {self.stop}{os.linesep}{self.text}"
+        return self._str
     
     @staticmethod
     def format_timestamp(hr, mn, sc, ms) -> str:
         """ Given hours, minutes, seconds, milliseconds, return timestamp string. """
-        ts = [int(t) for t in (hr, mn, sc, ms)]
-        return "{:02d}:{:02d}:{:02d},{:03d}".format(*ts)
+        return f"{int(hr):02d}:{int(mn):02d}:{int(sc):02d},{int(ms):03d}"
+    
+    @staticmethod
+    def ms_to_timestamp(total_ms: int) -> str:
+        """ Convert int `total_ms` in milliseconds to timestamp in format "HH:MM:ss,mmm" """
+        hr, rem = divmod(total_ms, 3600000)
+        mn, rem = divmod(rem, 60000)
+        sc, ms = divmod(rem, 1000)
+        return f"{hr:02d}:{mn:02d}:{sc:02d},{ms:03d}"
     
     @classmethod
     def seconds_to_timestamp(cls, s: float) -> str:
-        """ Convert int `s` in seconds to timestamp in format "HH:MM:ss,mmm" """
-        hr, mn = divmod(s, 3600)
-        mn, sc = divmod(mn, 60)
-        sc, ms = divmod(sc, 1)
-        ms *= 1000
-        return cls.format_timestamp(hr, mn, sc, ms)
+        """ Convert `s` in seconds to timestamp in format "HH:MM:ss,mmm" """
+        return cls.ms_to_timestamp(round(s*1000))
     
     @classmethod
     def timestamp_to_seconds(cls, ts: str) -> float:
         """ Convert timestamp string to number of seconds """
         hr, mn, sc, ms = cls._verify_string(ts)
-        sc += 3600*hr + 60*mn + ms/1000
-        return sc
+        return hr*3600 + mn*60 + sc + ms/1000
     
     @staticmethod
     def _verify_string(ts):
         """ Verify that string `ts` represents a timestamp in the expected format. """
         try:
-            hr, mn, sc, ms = [float(s) for s in re.split(r"\:|\,", ts)]
-        except Exception:
-            try:
-                hr, mn, sc, ms = [float(s) for s in re.split(r"\:|\.", ts)]
-            except Exception:
-                msg = f"Could not parse timestamp '{ts}'. Expected format is 'HH:MM:ss,mmm'"
-                raise RuntimeError(msg)
-        return hr, mn, sc, ms
+            hr, mn, rest = ts.replace('.', ',').split(':')
+            sc, ms = rest.split(',')
+            return int(hr), int(mn), int(sc), int(ms)
+        except ValueError:
+            msg = f"Could not parse timestamp '{ts}'. Expected format is 'HH:MM:ss,mmm'"
+            raise RuntimeError(msg)
 
 class SrtConverter:
     
@@ -105,12 +135,14 @@ class SrtConverter:
         self._quiet = quiet
         self._subs = []
 
-    def convert(self, in_path, out_path=None, encoding='utf-8', **kwargs):
+    def convert(self, in_path, out_path=None, encoding=None, **kwargs):
         """ 
         Convert subtitle file `in_path` to srt and write to `out_path`
         
         If `out_path` is None, prompt to overwrite (if `self.quiet` is False - 
         otherwise overwrite without prompting).
+        
+        If `encoding` is None, it will be detected when reading `in_path`.
         """
         in_path = Path(in_path)
         file_content = self._parse(in_path, encoding=encoding)
@@ -125,22 +157,39 @@ class SrtConverter:
                     print("Aborting")
                     return
                 
-        subtitles = [self._parse_subtitle(line, **kwargs) for line in file_content]
+        # lines are parsed, verified and indexed one at a time as they are written
+        subtitles = (self._parse_subtitle(line, **kwargs) for line in file_content)
         subtitles = self._verify_subtitles(subtitles)
-        subtitles = self._index_subtitles(subtitles)
-        subtitles = os.linesep.join(subtitles)
         
-        with open(out_path, 'w') as fileobj:
-            fileobj.write(subtitles)
+        # as parsing can fail part way through, write to a temporary file and 
+        # only replace `out_path` once everything has been written
+        # (resolve symlinks, so that the file they point to is replaced, not the link)
+        out_path = out_path.resolve()
+        fd, tmp_path = tempfile.mkstemp(dir=out_path.parent, prefix=out_path.name, suffix='.part')
+        tmp_path = Path(tmp_path)
+        try:
+            with open(fd, 'w') as fileobj:
+                fileobj.writelines(self._index_subtitles(subtitles))
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if out_path.exists():
+            shutil.copymode(out_path, tmp_path)
+        else:
+            # mkstemp makes the file private; give it the mode `open` would have
+            umask = os.umask(0)
+            os.umask(umask)
+            tmp_path.chmod(0o666 & ~umask)
+        os.replace(tmp_path, out_path)
             
-    def _parse(self, p: Path, encoding: str='utf-8') -> list:
+    def _parse(self, p: Path, encoding: str=None) -> list:
         """ 
         Return list of non-empty lines in file `path`. 
         
         If overriding, this method must return an iterable object.
         """
         self._verify_file(p)
-        lines = read_lines(p)
+        lines = read_lines(p, encoding=encoding, quiet=self._quiet)
         return lines
     
     def _parse_subtitle(self, line: str, **kwargs) -> Subtitle:
@@ -153,14 +202,19 @@ class SrtConverter:
         """
         raise NotImplementedError("Implement '_parse_subtitle' in subclasses/mixins")
         
-    def _verify_subtitles(self, subtitles: list[Subtitle]) -> list[Subtitle]:
-        """ Override this in subclasses to check the subtitles returned by :meth:`_parse_subtitle` """
+    def _verify_subtitles(self, subtitles: Iterable[Subtitle]) -> Iterable[Subtitle]:
+        """ 
+        Override this in subclasses to check the subtitles returned by :meth:`_parse_subtitle` 
+        
+        `subtitles` is an iterator, which should be consumed lazily.
+        """
         return subtitles
     
-    def _index_subtitles(self, subtitles: list[Subtitle]) -> list[str]:
-        """ Return list of indexed strings from list of Subtitles. """
-        subtitles = [f"{idx+1}{os.linesep}{sub}{os.linesep}" for idx, sub in enumerate(subtitles)]
-        return subtitles
+    def _index_subtitles(self, subtitles: Iterable[Subtitle]) -> Iterator[str]:
+        """ Yield indexed strings from Subtitles, separated by blank lines. """
+        for idx, sub in enumerate(subtitles):
+            sep = os.linesep if idx else ""
+            yield f"{sep}{idx+1}{os.linesep}{sub}{os.linesep}"
         
     @staticmethod
     def _verify_file(p: Path):
@@ -10,23 +10,24 @@ import os
 import re
 from .srt_converter import SrtConverter, Subtitle
 
+_SUB_LINE_RE = re.compile(r"\{(\d+)\}\{(\d+)\}(.*)") # start frame, stop frame, text
+
 class SubToSrtConverter(SrtConverter):
 
     def _parse_subtitle(self, line: str, fps: float) -> str:
-        regex = re.compile(r"\{(?P<start_frame>\d+)\}\{(?P<stop_frame>\d+)\}(?P<text>.*)")
-        if (m:=regex.match(line)) is None:
+        if (m:=_SUB_LINE_RE.match(line)) is None:
             raise ValueError(f"Could not parse line '{line}'")
         else:
-            frames = [int(m.group(g)) for g in ['start_frame', 'stop_frame']]
-            text = re.sub(r"\|", os.linesep, m.group('text'))
+            frames = [int(m.group(1)), int(m.group(2))]
+            text = m.group(3).replace("|", os.linesep)
             ts = [self._format_time_frames(f, fps) for f in frames]
-            sub = Subtitle(*ts, text)
+            sub = Subtitle._from_canonical(*ts, text)
             return sub
             
     @classmethod
     def _format_time_frames(cls, f: int, fps: int) -> str:
         """ Convert a frame number `f` to timestamp in format "HH:MM:ss,mmm", using `fps` """
-        return Subtitle.seconds_to_timestamp(f/fps)
+        return Subtitle.ms_to_timestamp(round(f*1000/fps))
     #     return cls._format_time_seconds(f/fps)
            
     # @staticmethod
@@ -9,23 +9,28 @@ import re
 from bs4 import BeautifulSoup
 from .srt_converter import SrtConverter, Subtitle
 
+_TTML_TS_RE = re.compile(r"(?:(\d+):)?(\d+):(\d+)(?:\.(\d+))?") # [hours:]minutes:seconds[.fraction]
+
 class TtmlToSrtConverter(SrtConverter):
     
-    def _parse(self, p) -> list:
+    def _parse(self, p, encoding=None) -> list:
         """ Return list of 'p' tags in body of `p`  """
         self._verify_file(p)
-        with open(p) as fileobj:
-            soup = BeautifulSoup(fileobj, "xml")  
+        # read as bytes, so that, if `encoding` is None, BeautifulSoup detects it
+        with open(p, 'rb') as fileobj:
+            soup = BeautifulSoup(fileobj, "xml", from_encoding=encoding)
         # hack:
         # we need <p> elements, the text in these in the subtitles
         # each <p> may contain spans indicating another speaker
         # however, they may also contain line breaks that *don't* indicate abother speaker
         # i couldn't figure out how to get the text and spans, but ignore the brs
         # so let's just directly replace them with "\n" here
-        body = str(soup.body)
-        body = re.sub(r"\<br */?\>", os.linesep, body)
-        soup = BeautifulSoup(body, "xml")
-        lines = soup.find_all('p')
+        for br in soup.body.find_all('br'):
+            br.replace_with(os.linesep)
+        # merge the new "\n" strings with their neighbours, so that stripped_strings
+        # gives one string per speaker, not one per line
+        soup.body.smooth()
+        lines = soup.body.find_all('p')
         return lines
 
     def _parse_subtitle(self, line: str, **kwargs) -> str: 
@@ -43,7 +48,7 @@ class TtmlToSrtConverter(SrtConverter):
         if len(lines) > 1:
             lines = [f"- {s}" for s in lines]
         text = os.linesep.join(lines)
-        sub = Subtitle(*ts, text)
+        sub = Subtitle._from_canonical(*ts, text)
         return sub
 
     def _verify_subtitles(self, subtitles):
@@ -52,53 +57,36 @@ class TtmlToSrtConverter(SrtConverter):
         
         If so, combine them.
         """
-        subs = [] # list of verified subtitles
-        idx = 0
-        while idx < len(subtitles):
-            group = [] # make temp group of subs with same start
-            # could be more than two with the same start, so need inner while loop
-            while idx < len(subtitles)-1 and subtitles[idx] == subtitles[idx+1]:
-                if not group:
-                    # if starting group, append first sub
-                    group.append(subtitles[idx])
-                # append next
-                group.append(subtitles[idx+1])
-                idx += 1
-            
-            if group:
-                start = group[0].start
-                stop = max([Subtitle.timestamp_to_seconds(sub.stop) for sub in group])
-                stop = Subtitle.seconds_to_timestamp(stop)
-                text = os.linesep.join([sub.text for sub in group])
-                sub = Subtitle(start, stop, text)
-            else:
-                sub = subtitles[idx]
-            subs.append(sub)
-            idx += 1
-        return subs
+        group = [] # subs with the same start, waiting to be yielded
+        for sub in subtitles:
+            if group and sub != group[0]:
+                yield self._merge_subtitles(group)
+                group = []
+            group.append(sub)
+        if group:
+            yield self._merge_subtitles(group)
+    
+    @staticmethod
+    def _merge_subtitles(group):
+        """ Combine list of subtitles with the same start into a single Subtitle """
+        if len(group) == 1:
+            return group[0]
+        start = group[0].start
+        stop = max(sub._stop_s for sub in group)
+        stop = Subtitle.seconds_to_timestamp(stop)
+        text = os.linesep.join([sub.text for sub in group])
+        return Subtitle._from_canonical(start, stop, text)
     
     @staticmethod
     def _format_time(ts):
-        split = ts.split(":")
-        if len(split) == 3:
-            hr, mn, sc_ms = split
-        elif len(split) == 2:
-            mn, sc_ms = split
-            hr = 0
-        else:
+        if (m:=_TTML_TS_RE.fullmatch(ts)) is None:
             raise RuntimeError(f"Cannot parse timestamp '{ts}'")
-            
-        split = sc_ms.split('.')
-        if len(split) == 2:
-            sc, ms = split
-        elif len(split) == 1:
-            sc = split[0]
-            ms = 0
-        else:
-            raise RuntimeError(f"Cannot parse timestamp '{ts}'")
-            
-        ts = [int(t) for t in (hr, mn, sc, ms)]
-        return "{:02d}:{:02d}:{:02d},{:03d}".format(*ts)
+        hr = int(m.group(1) or 0)
+        mn = int(m.group(2))
+        sc = int(m.group(3))
+        # fraction of a second, e.g. '.5' is 500ms
+        ms = int((m.group(4) or '0').ljust(3, '0')[:3])
+        return f"{hr:02d}:{mn:02d}:{sc:02d},{ms:03d}"
         
 if __name__ == "__main__":
     
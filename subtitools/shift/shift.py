@@ -5,14 +5,16 @@ Given an srt file, shift the subtitle timestamps by a given time.
 """
 
 import re
-import os
-from datetime import datetime, timedelta
 import argparse
-from ..utils import read_lines
+from functools import lru_cache, partial
+from ..utils import read_text
 
-rng_regex = re.compile(r"(?P<start>\d\d:\d\d:\d\d,\d\d\d) --> (?P<end>\d\d:\d\d:\d\d,\d\d\d)")
-ts_regex = re.compile(r"(?P<hour>\d\d):(?P<minute>\d\d):(?P<second>\d\d),(?P<microsecond>\d\d\d)")
-ts_groups = ['hour', 'minute', 'second', 'microsecond'] # final group in srt timestamp is ms, but datetime needs microsecond
+rng_regex = re.compile(r"(\d\d):(\d\d):(\d\d),(\d\d\d) --> (\d\d):(\d\d):(\d\d),(\d\d\d)", re.ASCII)
+rng_template = b"00:00:00,000 --> 00:00:00,000" # '0' marks a digit in `rng_regex`
+
+# if numba is installed, files at least this many characters long are shifted
+# with a compiled kernel; below this, importing numba costs more than it saves
+JIT_MIN_LENGTH = 5_000_000
 
 def do_shift(fname, h=0, m=0, s=0, ms=0) -> str:
     """ 
@@ -20,35 +22,86 @@ def do_shift(fname, h=0, m=0, s=0, ms=0) -> str:
     
     Return str of new data to be written to file.
     """
-    out = []
-    t_shift = timedelta(hours=h, minutes=m, seconds=s, milliseconds=ms)
-    
-    lines = read_lines(fname, strip_empty=False)
-    for line in lines:
-        if (m := rng_regex.match(line)) is not None:
-            start = _shift(m.group('start'), t_shift)
-            end = _shift(m.group('end'), t_shift)
-            line = f"{start} --> {end}"
-        out.append(line
-                   )
-    out = os.linesep.join(out)
-    return out
+    shift_ms = h*3600000 + m*60000 + s*1000 + ms
+    text = read_text(fname, strip_cr=True)
+    if shift_ms == 0:
+        return text
+    if len(text) >= JIT_MIN_LENGTH and (kernel := _get_jit_kernel()) is not None:
+        return _shift_jit(kernel, text, shift_ms)
+    return rng_regex.sub(partial(_format_pair, shift_ms), text)
+
+def _format_pair(shift_ms, match):
+    """ Return shifted "start --> end" string from `rng_regex` match object """
+    h0, m0, s0, ms0, h1, m1, s1, ms1 = map(int, match.groups())
+    start = _shift_ts(h0, m0, s0, ms0, shift_ms)
+    end = _shift_ts(h1, m1, s1, ms1, shift_ms)
+    return f"{start} --> {end}"
                 
-def _shift(s, t_shift):
-    t = _make_time(s) # convert time from string `s` to datetime
-    t = _strftime(t + t_shift) # apply shift and cast back to string
-    return t
+def _shift_ts(hr, mn, sc, ms, shift_ms):
+    """ Shift timestamp by `shift_ms` milliseconds and return new string """
+    total = ((hr*60 + mn)*60 + sc)*1000 + ms + shift_ms
+    total %= 86400000 # wrap around midnight, as datetime did
+    hr, rem = divmod(total, 3600000)
+    mn, rem = divmod(rem, 60000)
+    sc, ms = divmod(rem, 1000)
+    return f"{hr:02d}:{mn:02d}:{sc:02d},{ms:03d}"
+
+def _shift_jit(kernel, text, shift_ms):
+    """ Shift all timestamps in `text` with compiled `kernel` and return new string """
+    import numpy as np
+    buf = bytearray(text.encode('utf-8'))
+    template = np.frombuffer(rng_template, dtype=np.uint8)
+    kernel(np.frombuffer(buf, dtype=np.uint8), template, shift_ms)
+    return buf.decode('utf-8')
 
-def _make_time(s):
-    # given regex match group string, return datetime.datetime
-    t = ts_regex.match(s)
-    t = {g: int(t.group(g)) for g in ts_groups}
-    t['microsecond'] *= 1000 # ms to microsecond
-    d = datetime(2022, 1, 1, **t) # use any year, month, day
-    return d
+@lru_cache(maxsize=None)
+def _get_jit_kernel():
+    """ Return numba-compiled :func:`_shift_buffer`, or None if numba is not installed """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_shift_buffer)
 
-def _strftime(d):
-    return d.strftime("%H:%M:%S,%f")[:-3] # microsecond back to ms
+def _shift_buffer(buf, template, shift_ms):
+    """ 
+    Shift every "start --> end" range in uint8 array `buf` by `shift_ms` in place.
+    
+    Ranges are found by comparing `buf` to `template` (see `rng_template`), 
+    in the same way as `rng_regex`. Shifted timestamps are always the same 
+    width, so they can be written back over the originals.
+    """
+    n = len(template)
+    i = 0
+    while i <= len(buf) - n:
+        matched = True
+        for j in range(n):
+            c = buf[i+j]
+            if template[j] == 48:
+                if c < 48 or c > 57:
+                    matched = False
+                    break
+            elif c != template[j]:
+                matched = False
+                break
+        if not matched:
+            i += 1
+            continue
+        for k in (i, i+17):
+            hr = (buf[k]-48)*10 + buf[k+1]-48
+            mn = (buf[k+3]-48)*10 + buf[k+4]-48
+            sc = (buf[k+6]-48)*10 + buf[k+7]-48
+            ms = (buf[k+9]-48)*100 + (buf[k+10]-48)*10 + buf[k+11]-48
+            total = ((hr*60 + mn)*60 + sc)*1000 + ms + shift_ms
+            total %= 86400000 # wrap around midnight, as in _shift_ts
+            hr, rem = divmod(total, 3600000)
+            mn, rem = divmod(rem, 60000)
+            sc, ms = divmod(rem, 1000)
+            buf[k], buf[k+1] = 48 + hr//10, 48 + hr%10
+            buf[k+3], buf[k+4] = 48 + mn//10, 48 + mn%10
+            buf[k+6], buf[k+7] = 48 + sc//10, 48 + sc%10
+            buf[k+9], buf[k+10], buf[k+11] = 48 + ms//100, 48 + ms//10%10, 48 + ms%10
+        i += n
 
 def make_argparser():
     parser = argparse.ArgumentParser(prog="subtitools shift", description=__doc__)
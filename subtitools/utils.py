@@ -5,15 +5,34 @@ utility functions.
 """
 from pathlib import Path
 import os
-import re
 
 def read_lines(p: Path, encoding=None, strip_empty=True, quiet=False) -> list[str]:
     """ 
     Return list of lines from file `p`.
     
+    See :func:`read_text` for how `encoding` is handled.
+    """
+    text = read_text(p, encoding=encoding, quiet=quiet)
+    # files read in text mode already have \n line endings, but text decoded by 
+    # charset_normalizer may still contain \r\n or \r
+    # (don't use splitlines, as that also splits on other characters, e.g. \u2028)
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    if strip_empty:
+        lines = [line for line in lines if line]
+    return lines
+
+def read_text(p: Path, encoding=None, quiet=False, strip_cr=False) -> str:
+    """ 
+    Return contents of file `p` as a string.
+    
+    If `strip_cr` is True, remove '\\r' characters if they are not part of 
+    this OS's line separator.
+    
     If `encoding` is explicitly provided, use that. 
     Otherise, attempt to use [charset_normalizer](https://pypi.org/project/charset-normalizer) to detect encoding.
-    If `encoding` is None and charset_normalizer is not installed, use default 'utf-8'.
+    If `encoding` is None and charset_normalizer is not installed, use default 'utf-8',
+    falling back to 'cp1252' and then 'latin-1' (which can decode any file, 
+    but may not give the intended characters) if that fails.
     """
     if encoding is not None:
         text = _read_file(p, encoding=encoding)
@@ -21,24 +40,25 @@ def read_lines(p: Path, encoding=None, strip_empty=True, quiet=False) -> list[st
         try:
             from charset_normalizer import from_path
         except:
-            text = _read_file(p)
+            for fallback in ['utf-8', 'cp1252', 'latin-1']:
+                try:
+                    text = _read_file(p, encoding=fallback)
+                except UnicodeDecodeError:
+                    continue
+                else:
+                    break
             if not quiet:
                 print("** For better results, install charset_normalizer **")
         else:
             text = str(from_path(p).best())
         
-    if '\r' not in os.linesep and '\r' in text:
+    if strip_cr and '\r' not in os.linesep and '\r' in text:
         # if test has \r chars that are not necessary on this OS, remove them
-        text = re.sub(r"\r", "", text)
+        text = text.replace("\r", "")
         
-    if strip_empty:
-        lines = [line for line in text.split(os.linesep) if line]
-    else:
-        lines = [line for line in text.split(os.linesep)]
-    
-    return lines
+    return text
 
 def _read_file(p, encoding='utf-8'):
-    with open(p, encoding='utf-8') as fileobj:
+    with open(p, encoding=encoding) as fileobj:
         text = fileobj.read()
     return text
\ No newline at end of file